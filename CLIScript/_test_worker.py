@@ -0,0 +1,138 @@
+"""CLITestRunner 使用的常驻测试工作进程
+
+启动时预先导入常用的标准库模块，之后从标准输入逐行读取JSON请求，每条命令 fork 出一个
+子进程执行主脚本，并通过标准输出回复退出码。子进程按解释器的退出流程结束，
+因此结果与 ``python main.py ...`` 单独运行时一致。
+工作进程以调用方当时的工作目录和环境变量启动，两者变化时由 CLITestRunner 重新启动。
+
+用法: python _test_worker.py <主脚本路径>
+"""
+import atexit
+import json
+import os
+import runpy
+import signal
+import sys
+
+
+def _is_internal_frame(frame) -> bool:
+    """判断是否是工作进程自身或runpy的栈帧，打印异常时跳过这些帧"""
+    filename = frame.f_code.co_filename
+    return (filename == __file__ or filename == runpy.__file__
+            or filename.startswith("<frozen runpy"))
+
+
+def _report_exception():
+    """像解释器一样通过 sys.excepthook 打印未捕获的异常，去掉工作进程自身的栈帧"""
+    exc_type, exc_value, tb = sys.exc_info()
+    while tb is not None and _is_internal_frame(tb.tb_frame):
+        tb = tb.tb_next
+    # 默认的 excepthook 使用异常对象自身的 __traceback__，需要一并替换
+    sys.excepthook(exc_type, exc_value.with_traceback(tb), tb)
+
+
+def _exit_code(code) -> int:
+    """按解释器处理 SystemExit 的规则计算退出码"""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def _run_child(script: str, request: dict):
+    """在fork出的子进程中运行主脚本，不会返回"""
+    signal.signal(signal.SIGALRM, signal.SIG_DFL)
+
+    # 把标准输入输出重定向到父进程准备的临时文件
+    for fd, path, flags in ((0, request["stdin"], os.O_RDONLY),
+                            (1, request["stdout"], os.O_WRONLY),
+                            (2, request["stderr"], os.O_WRONLY)):
+        target = os.open(path, flags)
+        os.dup2(target, fd)
+        os.close(target)
+
+    sys.argv = [script] + request["args"]
+    code = 0
+    try:
+        # 与 python main.py 一致，主脚本的 __file__ 是绝对路径
+        runpy.run_path(os.path.abspath(script), run_name="__main__")
+    except SystemExit as e:
+        code = _exit_code(e.code)
+    except BaseException:
+        _report_exception()
+        code = 1
+
+    # 与解释器退出流程一致：先等待非守护线程结束，再执行 atexit 注册的函数
+    try:
+        threading = sys.modules.get("threading")
+        if threading is not None:
+            threading._shutdown()
+        atexit._run_exitfuncs()
+    except SystemExit as e:
+        code = _exit_code(e.code)
+    except BaseException:
+        _report_exception()
+
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    finally:
+        os._exit(code & 0xFF)
+
+
+def _wait_child(pid: int, timeout: int):
+    """等待子进程结束并返回退出码，超时则杀死子进程并返回None"""
+    timed_out = []
+
+    def kill_child(signum, frame):
+        timed_out.append(True)
+        os.kill(pid, signal.SIGKILL)
+
+    signal.signal(signal.SIGALRM, kill_child)
+    signal.alarm(timeout)
+    try:
+        _, status = os.waitpid(pid, 0)
+    finally:
+        signal.alarm(0)
+
+    if timed_out:
+        return None
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def main():
+    script = sys.argv[1]
+    # 请求和回复使用单独的文件描述符，子进程重定向0/1/2时不受影响
+    requests = os.fdopen(os.dup(0), "r")
+    replies = os.fdopen(os.dup(1), "w")
+
+    # 与 python main.py 一致，主脚本所在目录作为第一个模块搜索路径
+    sys.path[0] = os.path.dirname(os.path.abspath(script))
+    # 只预先导入标准库模块；CLIScript由主脚本自己导入，
+    # 主脚本修改 sys.path 后导入的才是它实际要运行的版本
+    import argparse
+    import dataclasses
+    import enum
+    import typing
+
+    for line in requests:
+        request = json.loads(line)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_child(script, request)
+            finally:
+                os._exit(1)
+        exit_code = _wait_child(pid, request["timeout"])
+        replies.write(json.dumps({"exit_code": exit_code}) + "\n")
+        replies.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,68 @@
 import argparse
+import functools
 import os
 import sys
-import importlib.util
-import importlib
-from typing import Dict, List, Any, Callable
+import operator
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+# CLI数据类型到Python类型的映射
+_TYPE_MAP = {
+    "string": str,
+    "int": int,
+    "float": float,
+    "bool": bool
+}
+
+# CLI数据类型到值转换函数的映射
+_CONVERTERS = {
+    "bool": lambda value: value.lower() == "true",
+    "int": int,
+    "float": float,
+    "string": str
+}
+
+
+def _setup_bool_option(kwargs: Dict[str, Any], attributes: Dict[str, Any]):
+    """布尔选项作为标志处理，根据默认值使用 store_true 或 store_false"""
+    default_value = attributes.get("default", "false").lower() == "true"
+    kwargs["action"] = "store_false" if default_value else "store_true"
+
+
+def _setup_int_option(kwargs: Dict[str, Any], attributes: Dict[str, Any]):
+    kwargs["type"] = int
+
+
+def _setup_float_option(kwargs: Dict[str, Any], attributes: Dict[str, Any]):
+    kwargs["type"] = float
+
+
+# CLI数据类型到选项类型设置函数的映射
+_OPTION_SETUP = {
+    "bool": _setup_bool_option,
+    "int": _setup_int_option,
+    "float": _setup_float_option
+}
+
+# 用于区分"属性不存在"和"属性值为None"的哨兵对象
+_MISSING = object()
+
+
+class _LazyArgumentParser(argparse.ArgumentParser):
+    """延迟构建的子命令解析器
+
+    选项和参数在该子命令第一次被解析时才通过populate回调添加，
+    未被调用的子命令不产生构建开销。
+    """
+
+    def __init__(self, *args, populate: Optional[Callable] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._populate = populate
+
+    def parse_known_args(self, args=None, namespace=None):
+        if self._populate is not None:
+            populate, self._populate = self._populate, None
+            populate(self)
+        return super().parse_known_args(args, namespace)
 
 
 class CLIRunner:
@@ -12,6 +71,9 @@ class CLIRunner:
     def __init__(self, ast: List[Dict[str, Any]]):
         self.ast = ast
         self.imported_modules = {}
+        self._pending_modules = {}  # 尚未导入的模块: 模块名 -> 模块路径
+        self._module_order = []  # use语句声明模块的顺序
+        self._base_module = None  # 第一个成功导入的模块，查找函数的基础
         self.parser = None
         self.subparsers = None
         self.has_default_command = False
@@ -19,11 +81,18 @@ class CLIRunner:
         self.appname = "CLI Tool"
         self.root_options = []  # 存储根选项
         self.root_actions = {}  # 存储根选项对应的动作
+        self._formatter_class = argparse.HelpFormatter  # 各解析器共用的帮助格式化器
+        self._root_dispatch: List[Tuple[str, Any, Dict[str, Any]]] = []  # 有动作的根选项的分发表
+        self._nodes_by_type = {}  # 按类型分组的AST节点
+        self._func_cache: Dict[str, Callable] = {}  # 函数路径 -> 已解析的函数
 
     def run(self):
         """运行CLI"""
         try:
-            # 导入模块
+            # 按类型对AST节点分组
+            self._classify_ast()
+
+            # 登记模块（延迟导入）
             self._import_modules()
 
             # 检查是否有default命令
@@ -45,123 +114,220 @@ class CLIRunner:
             print(f"Error: {e}", file=sys.stderr)
             sys.exit(1)
 
+    def _classify_ast(self):
+        """遍历一次AST，按节点类型分组"""
+        self._nodes_by_type = {}
+        for node in self.ast:
+            self._nodes_by_type.setdefault(node["type"], []).append(node)
+
+            # 展开命令体，后续直接访问 _options/_arguments/_action
+            if node["type"] == "root_options":
+                options = node["options"]
+            elif node["type"] in ("command", "default"):
+                body = node["body"]
+                options = node["_options"] = body["options"]
+                node["_arguments"] = body["arguments"]
+                node["_action"] = body.get("action")
+
+                for argument in node["_arguments"]:
+                    self._intern_data_type(argument)
+            else:
+                continue
+
+            # 预先计算选项标志对应的dest名
+            for option in options:
+                self._precompute_dests(option)
+                self._intern_data_type(option)
+
+    def _intern_data_type(self, node: Dict[str, Any]):
+        """规范化并驻留数据类型字符串，未声明类型的按string处理"""
+        node["data_type"] = sys.intern(node.get("data_type") or "string")
+
+    def _precompute_dests(self, option: Dict[str, Any]):
+        """计算选项第一个长标志和第一个短标志对应的dest名，存储到选项中"""
+        long_dest = None
+        short_dest = None
+        for flag in option["flags"]:
+            # 标志前缀只有1~2个字符，直接比较字符比startswith更快
+            if len(flag) > 1 and flag[0] == '-' and flag[1] == '-':
+                if long_dest is None:
+                    long_dest = flag[2:].replace('-', '_')
+            elif flag and flag[0] == '-':
+                if short_dest is None:
+                    short_dest = flag[1:].replace('-', '_')
+        option["_long_dest"] = long_dest
+        option["_short_dest"] = short_dest
+
     def _find_appname(self):
         """查找并设置应用名称"""
-        for node in self.ast:
-            if node["type"] == "appname":
-                self.appname = node["name"]
-                break
+        nodes = self._nodes_by_type.get("appname")
+        if nodes:
+            self.appname = nodes[0]["name"]
 
     def _import_modules(self):
-        """导入use语句中指定的模块"""
+        """登记use语句中指定的模块，实际导入推迟到第一次需要时"""
 
-        for node in self.ast:
-            if node["type"] == "use":
-                module_path = node["module"]
-
-                # 检查是否是文件路径
-                if module_path.endswith('.py') and os.path.exists(module_path):
-                    # 文件路径导入
-                    try:
-                        # 从文件路径导入模块
-                        module_name = os.path.basename(module_path).replace('.py', '')
-                        spec = importlib.util.spec_from_file_location(module_name, module_path)
-                        module = importlib.util.module_from_spec(spec)
-                        spec.loader.exec_module(module)
-                        self.imported_modules[module_name] = module
-                    except Exception as e:
-                        print(f"Error: Could not import module from {module_path}: {e}", file=sys.stderr)
-                else:
-                    # 标准模块导入
-                    module_name = module_path.replace('.py', '')
-                    try:
-                        module = importlib.import_module(module_name)
-                        self.imported_modules[module_name] = module
-                    except ImportError as e:
-                        print(f"Error: Could not import module {module_name}: {e}", file=sys.stderr)
+        for node in self._nodes_by_type.get("use", []):
+            module_path = node["module"]
+
+            # 检查是否是文件路径
+            if module_path.endswith('.py') and os.path.exists(module_path):
+                module_name = os.path.basename(module_path).replace('.py', '')
+            else:
+                module_name = module_path.replace('.py', '')
+
+                # 已经导入过的标准模块直接复用，无需再走导入流程
+                if module_name in sys.modules:
+                    self.imported_modules[module_name] = sys.modules[module_name]
+                    self._module_order.append(module_name)
+                    continue
+
+            self._pending_modules[module_name] = module_path
+            self._module_order.append(module_name)
+
+    def _ensure_imported(self, module_name: str):
+        """按需导入模块，导入结果缓存在imported_modules中"""
+        module = self.imported_modules.get(module_name)
+        if module is not None:
+            return module
+
+        module_path = self._pending_modules.pop(module_name, None)
+        if module_path is None:
+            return None
+
+        # importlib只在真正需要导入时才加载，缩短启动时间
+        import importlib
+        import importlib.util
+
+        if module_path.endswith('.py') and os.path.exists(module_path):
+            # 文件路径导入
+            try:
+                # 从文件路径导入模块
+                spec = importlib.util.spec_from_file_location(module_name, module_path)
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+            except Exception as e:
+                print(f"Error: Could not import module from {module_path}: {e}", file=sys.stderr)
+                return None
+        else:
+            # 标准模块导入
+            try:
+                module = sys.modules.get(module_name) or importlib.import_module(module_name)
+            except ImportError as e:
+                print(f"Error: Could not import module {module_name}: {e}", file=sys.stderr)
+                return None
+
+        self.imported_modules[module_name] = module
+        return module
 
     def _check_default_command(self):
         """检查是否有default命令"""
-        for node in self.ast:
-            if node["type"] == "default":
-                self.has_default_command = True
-                self.default_command = node
-                break
+        nodes = self._nodes_by_type.get("default")
+        if nodes:
+            self.has_default_command = True
+            self.default_command = nodes[0]
 
     def _find_root_options(self):
         """查找根选项定义"""
-        for node in self.ast:
-            if node["type"] == "root_options":
-                self.root_options = node["options"]
-                # 构建根选项动作映射
-                for option in self.root_options:
-                    if "action" in option:
-                        # 使用第一个标志作为动作的key
-                        if option["flags"]:
-                            flag = option["flags"][0].lstrip('-')
-                            self.root_actions[flag] = option["action"]
-                break
+        nodes = self._nodes_by_type.get("root_options")
+        if nodes:
+            self.root_options = nodes[0]["options"]
+            # 构建根选项动作映射
+            for option in self.root_options:
+                if "action" in option:
+                    # 使用第一个标志作为动作的key
+                    if option["flags"]:
+                        flag = option["flags"][0].lstrip('-')
+                        self.root_actions[flag] = option["action"]
+
+    def _build_root_dispatch(self):
+        """为有动作的根选项预先计算分发表，需在根选项添加到解析器之后调用
+
+        默认值取自解析器，即已经按选项类型转换过的值（布尔选项未设置默认值时为False），
+        这样解析结果与默认值不同就说明用户在命令行中设置了该选项。
+        """
+        get_default = self.parser.get_default
+        self._root_dispatch = [
+            (option["_dest_name"], get_default(option["_dest_name"]), option["action"])
+            for option in self.root_options
+            if "action" in option and option.get("_dest_name")
+        ]
 
     def _build_parser(self):
         """构建argparse解析器"""
+        # argparse每次add_argument都会创建格式化器，默认实现每次都会查询终端尺寸；
+        # 这里每次构建时只查询一次，所有解析器共用这个宽度
+        import shutil
+        self._formatter_class = functools.partial(
+            argparse.HelpFormatter, width=shutil.get_terminal_size().columns - 2
+        )
+
         if self.has_default_command:
             # 对于default命令，使用appname作为描述
             description = self.appname
-            self.parser = argparse.ArgumentParser(description=description)
+            self.parser = argparse.ArgumentParser(description=description, formatter_class=self._formatter_class)
 
             # 添加根选项
             for option in self.root_options:
                 self._add_option(self.parser, option)
+            self._build_root_dispatch()
 
             # 添加default命令的选项和参数
-            body = self.default_command["body"]
-            for option in body["options"]:
+            for option in self.default_command["_options"]:
                 self._add_option(self.parser, option)
 
-            for argument in body["arguments"]:
+            for argument in self.default_command["_arguments"]:
                 self._add_argument(self.parser, argument)
 
             # 设置默认处理函数
-            action = body.get("action")
+            action = self.default_command["_action"]
             if action:
                 self.parser.set_defaults(
                     func=self._create_command_handler(action, self.default_command)
                 )
         else:
             # 对于多命令程序，使用appname作为主描述
-            self.parser = argparse.ArgumentParser(description=self.appname)
+            self.parser = argparse.ArgumentParser(description=self.appname, formatter_class=self._formatter_class)
 
             # 添加根选项
             for option in self.root_options:
                 self._add_option(self.parser, option)
+            self._build_root_dispatch()
 
             # 只有在有命令时才添加子命令
-            commands = [node for node in self.ast if node["type"] == "command"]
+            commands = self._nodes_by_type.get("command", [])
             if commands:
-                self.subparsers = self.parser.add_subparsers(dest='command', help='Available commands')
+                self.subparsers = self.parser.add_subparsers(
+                    dest='command', help='Available commands', parser_class=_LazyArgumentParser
+                )
 
                 # 为每个命令创建子解析器
                 for node in commands:
                     self._add_command(node)
 
     def _add_command(self, command_node: Dict[str, Any]):
-        """添加命令到解析器"""
+        """添加命令到解析器，命令的选项和参数在第一次解析该命令时才添加"""
         name = command_node["name"]
         description = command_node.get("description", "")
 
         # 创建子命令解析器
-        subparser = self.subparsers.add_parser(name, help=description)
+        self.subparsers.add_parser(
+            name, help=description, formatter_class=self._formatter_class,
+            populate=lambda subparser: self._populate_command(subparser, command_node)
+        )
 
+    def _populate_command(self, subparser, command_node: Dict[str, Any]):
+        """添加命令特定的选项、参数和处理函数"""
         # 添加命令特定的选项
-        for option in command_node["body"]["options"]:
+        for option in command_node["_options"]:
             self._add_option(subparser, option)
 
         # 添加命令特定的参数
-        for argument in command_node["body"]["arguments"]:
+        for argument in command_node["_arguments"]:
             self._add_argument(subparser, argument)
 
         # 设置命令处理函数
-        action = command_node["body"].get("action")
+        action = command_node["_action"]
         if action:
             subparser.set_defaults(
                 func=self._create_command_handler(action, command_node)
@@ -169,81 +335,44 @@ class CLIRunner:
 
     def _add_option(self, parser, option: Dict[str, Any]):
         """添加选项到解析器"""
+        # 预先绑定get方法，避免重复的属性查找
+        option_get = option.get
         flags = option["flags"]
-        data_type = option.get("data_type", "string")
-        param_name = option.get("param")
-        attributes = option.get("attributes", {})
-        description = option.get("description", "")
+        data_type = option_get("data_type", "string")
+        param_name = option_get("param")
+        attributes = option_get("attributes", {})
+        description = option_get("description", "")
 
         # 构建add_argument参数
         kwargs = {}
 
-        # 设置类型
-        if data_type == "bool":
-            # 布尔选项通常作为标志处理
-            # 使用 store_true 或 store_false 取决于默认值
-            default_value = attributes.get("default", "false").lower() == "true"
-            if default_value:
-                kwargs["action"] = "store_false"
-            else:
-                kwargs["action"] = "store_true"
-        elif data_type == "int":
-            kwargs["type"] = int
-        elif data_type == "float":
-            kwargs["type"] = float
-        # 字符串是默认类型，不需要特别设置
+        # 设置类型，字符串是默认类型，不需要特别设置
+        setup = _OPTION_SETUP.get(data_type)
+        if setup is not None:
+            setup(kwargs, attributes)
 
         # 设置默认值
         if "default" in attributes:
-            default_value = attributes["default"]
-            if data_type == "bool":
-                default_value = default_value.lower() == "true"
-                kwargs["default"] = default_value
-            elif data_type == "int":
-                kwargs["default"] = int(default_value)
-            elif data_type == "float":
-                kwargs["default"] = float(default_value)
-            else:
-                kwargs["default"] = default_value
+            kwargs["default"] = _CONVERTERS.get(data_type, str)(attributes["default"])
 
         # 设置帮助文本
         if description:
             kwargs["help"] = description
 
         # 对于根选项，我们需要记录dest名以便后续处理
-        dest_name = None
-        if param_name and data_type != "bool":
-            # 使用长标志名（去掉--前缀）作为dest
-            for flag in flags:
-                if flag.startswith("--"):
-                    dest_name = flag[2:].replace('-', '_')
-                    kwargs["dest"] = dest_name
-                    break
-                elif flag.startswith("-"):
-                    # 如果没有长标志，使用短标志（去掉-前缀）
-                    dest_name = flag[1:].replace('-', '_')
-                    kwargs["dest"] = dest_name
-            else:
-                # 如果没有找到合适的标志，使用param_name
-                dest_name = param_name
-                kwargs["dest"] = dest_name
+        # 优先使用长标志名（去掉--前缀）作为dest
+        long_dest = option_get("_long_dest")
+        if long_dest:
+            dest_name = long_dest
+        elif param_name and data_type != "bool":
+            # 带参数的选项没有长标志时，使用param_name
+            dest_name = param_name
         else:
-            # 没有参数的选项（标志）
-            # 设置dest为标志名
-            for flag in flags:
-                if flag.startswith("--"):
-                    dest_name = flag[2:].replace('-', '_')
-                    kwargs["dest"] = dest_name
-                    break
-                elif flag.startswith("-"):
-                    dest_name = flag[1:].replace('-', '_')
-                    kwargs["dest"] = dest_name
-            else:
-                # 如果没有找到合适的标志，生成一个dest名
-                if flags:
-                    first_flag = flags[0].lstrip('-')
-                    dest_name = first_flag.replace('-', '_')
-                    kwargs["dest"] = dest_name
+            # 没有参数的选项（标志）使用第一个短标志名
+            dest_name = option_get("_short_dest")
+
+        if dest_name:
+            kwargs["dest"] = dest_name
 
         # 存储dest名到option中，用于后续处理
         option["_dest_name"] = dest_name
@@ -252,11 +381,14 @@ class CLIRunner:
 
     def _add_argument(self, parser, argument: Dict[str, Any]):
         """添加位置参数到解析器"""
+        # 预先绑定get方法，避免重复的属性查找
+        argument_get = argument.get
         name = argument["name"]
-        data_type = argument.get("data_type", "string")
-        attributes = argument.get("attributes", {})
-        description = argument.get("description", "")
-        is_variadic = argument.get("variadic", False)
+        data_type = argument_get("data_type", "string")
+        attributes = argument_get("attributes", {})
+        attr_get = attributes.get
+        description = argument_get("description", "")
+        is_variadic = argument_get("variadic", False)
 
         # 构建add_argument参数
         kwargs = {}
@@ -286,7 +418,7 @@ class CLIRunner:
             # 修复：对于有默认值的参数，设置 nargs='?' 使其变为可选
             if "default" in attributes:
                 kwargs["nargs"] = '?'
-            elif attributes.get("required"):
+            elif attr_get("required"):
                 # 必需的参数，不设置nargs，argparse默认就是必需的
                 pass
             else:
@@ -298,38 +430,40 @@ class CLIRunner:
 
     def _get_python_type(self, data_type: str) -> type:
         """将CLI数据类型转换为Python类型"""
-        type_map = {
-            "string": str,
-            "int": int,
-            "float": float,
-            "bool": bool
-        }
-        return type_map.get(data_type, str)
+        return _TYPE_MAP.get(data_type, str)
 
     def _convert_value(self, value: str, data_type: str) -> Any:
         """根据数据类型转换值"""
-        if data_type == "bool":
-            return value.lower() == "true"
-        elif data_type == "int":
-            return int(value)
-        elif data_type == "float":
-            return float(value)
-        else:
-            return value
+        return _CONVERTERS.get(data_type, str)(value)
 
     def _create_command_handler(self, action: Dict[str, Any], command_node: Dict[str, Any]) -> Callable:
-        """创建命令处理函数"""
-
-        def command_handler(args):
+        """创建命令处理函数，静态信息在构建时绑定为处理函数的默认参数"""
+        function_path = action["function"]
+        # 预先计算参数名，argparse以参数名或选项的dest名保存解析结果，$变量直接引用这些名字
+        var_names = tuple(param[1:] if param and param[0] == '$' else param for param in action.get("params", []))
+        # 动作中引用到的无限参数
+        variadic_names = frozenset(
+            argument["name"] for argument in command_node["_arguments"]
+            if argument.get("variadic", False) and argument["name"] in var_names
+        )
+
+        def command_handler(args, _function_path=function_path, _var_names=var_names,
+                            _variadic_names=variadic_names, _self=self):
             # 获取函数
-            function_path = action["function"]
-            func = self._get_function(function_path)
+            func = _self._get_function(_function_path)
             if not func:
-                print(f"Error: Function {function_path} not found", file=sys.stderr)
+                print(f"Error: Function {_function_path} not found", file=sys.stderr)
                 return
 
             # 准备参数
-            func_args = self._prepare_function_args(args, action.get("params", []), command_node)
+            args_dict = vars(args)
+            func_args = {var_name: args_dict.get(var_name) for var_name in _var_names}
+
+            # 如果是无限参数，确保它是一个列表
+            for var_name in _variadic_names:
+                value = func_args[var_name]
+                if value is not None and not isinstance(value, list):
+                    func_args[var_name] = [value]
 
             # 调用函数
             try:
@@ -343,127 +477,62 @@ class CLIRunner:
 
         return command_handler
 
-    def _get_function(self, function_path: str) -> Callable | None:
+    def _get_base_module(self):
+        """获取查找函数的基础模块，即第一个成功导入的模块"""
+        if self._base_module is None:
+            for module_name in self._module_order:
+                self._base_module = self._ensure_imported(module_name)
+                if self._base_module is not None:
+                    break
+        return self._base_module
+
+    def _get_function(self, function_path: str) -> Optional[Callable]:
         """获取函数对象"""
+        # 已解析过的函数直接返回
+        cached = self._func_cache.get(function_path)
+        if cached is not None:
+            return cached
+
         # 如果没有导入任何模块，直接返回None
-        if not self.imported_modules:
+        base_module = self._get_base_module()
+        if base_module is None:
             return None
 
-        # 使用第一个导入的模块作为基础
-        base_module = next(iter(self.imported_modules.values()))
-
-        # 按点分割函数路径
-        parts = function_path.split('.')
-
-        # 从基础模块开始，沿着路径查找
-        current_obj = base_module
-        for part in parts:
-            if hasattr(current_obj, part):
-                current_obj = getattr(current_obj, part)
-            else:
-                # 如果路径中的任何部分不存在，返回None
-                return None
+        # 从基础模块开始，沿着点分隔的路径查找
+        try:
+            current_obj = operator.attrgetter(function_path)(base_module)
+        except AttributeError:
+            # 如果路径中的任何部分不存在，返回None
+            return None
 
         # 确保最终找到的对象是可调用的
         if callable(current_obj):
+            self._func_cache[function_path] = current_obj
             return current_obj
 
         return None
 
-    def _prepare_function_args(self, args, param_names: List[str], command_node: Dict[str, Any]) -> Dict[str, Any]:
-        """准备函数参数"""
-        func_args = {}
-
-        for param in param_names:
-            # 去掉$前缀
-            if param.startswith('$'):
-                var_name = param[1:]
-            else:
-                var_name = param
-
-            # 获取参数值
-            value = getattr(args, var_name, None)
-
-            # 如果直接获取失败，尝试从选项参数中查找
-            if value is None:
-                # 查找是否有选项使用这个变量名作为dest
-                for option in command_node["body"]["options"]:
-                    # 获取选项的dest名
-                    dest_name = None
-                    param_name = option.get("param")
-                    flags = option.get("flags", [])
-
-                    if param_name and option.get("data_type") != "bool":
-                        # 对于有参数的选项，使用我们设置的dest名
-                        for flag in flags:
-                            if flag.startswith("--"):
-                                dest_name = flag[2:].replace('-', '_')
-                                break
-                            elif flag.startswith("-"):
-                                dest_name = flag[1:].replace('-', '_')
-                        if not dest_name:
-                            dest_name = param_name
-                    else:
-                        # 对于布尔标志，使用标志名作为dest
-                        for flag in flags:
-                            if flag.startswith("--"):
-                                dest_name = flag[2:].replace('-', '_')
-                                break
-                            elif flag.startswith("-"):
-                                dest_name = flag[1:].replace('-', '_')
-
-                    if dest_name == var_name:
-                        value = getattr(args, dest_name, None)
-                        break
-
-            # 检查是否是无限参数
-            is_variadic = False
-            for arg in command_node["body"]["arguments"]:
-                if arg["name"] == var_name and arg.get("variadic", False):
-                    is_variadic = True
-                    break
-
-            # 如果是无限参数，确保它是一个列表
-            if is_variadic and value is not None and not isinstance(value, list):
-                value = [value]
-
-            func_args[var_name] = value
-
-        return func_args
-
     def _execute_command(self):
         """执行命令"""
         args = self.parser.parse_args()
+        args_dict = vars(args)
 
         # 首先检查是否有根选项被设置并且有对应的动作
-        for option in self.root_options:
-            dest_name = option.get("_dest_name")
-            if dest_name and hasattr(args, dest_name):
-                value = getattr(args, dest_name)
-
-                # 对于布尔类型的选项，只要值为 True 就执行
-                # 对于其他类型的选项，只有当值不为 None 且不为默认值时执行
-                should_execute = False
-                data_type = option.get("data_type", "string")
-
-                if data_type == "bool":
-                    # 对于布尔选项，如果设置了就执行
-                    if value is True:
-                        should_execute = True
-                else:
-                    # 非布尔类型，检查是否有设置值
-                    default_value = option.get("attributes", {}).get("default")
-                    # 对于有默认值的选项，只有当用户实际提供了值时才执行
-                    if value is not None and (default_value is None or value != default_value):
-                        should_execute = True
-
-                if should_execute and "action" in option:
+        # 大多数CLI的根选项没有动作，此时跳过整个检查；
+        # 命令行中没有任何标志时，所有根选项都保持默认值，不会触发动作
+        if self._root_dispatch and any(arg[:1] == '-' for arg in sys.argv[1:]):
+            for dest_name, default_value, action in self._root_dispatch:
+                value = args_dict.get(dest_name, _MISSING)
+                if value is _MISSING:
+                    continue
+
+                # 值与解析器中的默认值不同，说明用户实际设置了该选项
+                if value != default_value:
                     # 执行根选项对应的动作
-                    action = option["action"]
                     func = self._get_function(action["function"])
                     if func:
                         # 准备参数
-                        func_args = self._prepare_root_option_args(args, action.get("params", []), option)
+                        func_args = self._prepare_root_option_args(args, action.get("params", []))
                         try:
                             result = func(**func_args)
                             if result is not None:
@@ -480,8 +549,9 @@ class CLIRunner:
                         sys.exit(1)
 
         # 如果没有根选项被执行，检查是否有命令需要执行
-        if hasattr(args, 'func'):
-            args.func(args)
+        func = args_dict.get('func')
+        if func is not None:
+            func(args)
         else:
             # 如果没有找到处理函数，打印帮助信息
             if self.has_default_command:
@@ -491,25 +561,20 @@ class CLIRunner:
                 # 对于多命令程序，如果没有指定命令，显示帮助
                 self.parser.print_help()
 
-    def _prepare_root_option_args(self, args, param_names: List[str], option: Dict[str, Any]) -> Dict[str, Any]:
+    def _prepare_root_option_args(self, args, param_names: List[str]) -> Dict[str, Any]:
         """准备根选项函数参数"""
         func_args = {}
+        args_dict = vars(args)
 
         for param in param_names:
             # 去掉$前缀
-            if param.startswith('$'):
+            if param and param[0] == '$':
                 var_name = param[1:]
             else:
                 var_name = param
 
             # 获取参数值
-            value = getattr(args, var_name, None)
-
-            # 如果直接获取失败，尝试从选项本身查找
-            if value is None and var_name == option.get("_dest_name"):
-                value = getattr(args, var_name, None)
-
-            func_args[var_name] = value
+            func_args[var_name] = args_dict.get(var_name)
 
         return func_args
 
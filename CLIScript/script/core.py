@@ -1,7 +1,9 @@
 from dataclasses import dataclass
-from typing import List, Optional, Any, Dict
+from typing import List, Optional, Any, Dict, Tuple
 from enum import Enum
+import bisect
 import re
+import string
 import json
 
 
@@ -29,13 +31,37 @@ class TokenType(Enum):
     EOF = "eof"
 
 
+# token类型绑定为模块级常量，减少词法和语法分析热点路径上的属性查找
+_T_APPNAME = TokenType.APPNAME
+_T_USE = TokenType.USE
+_T_CMD = TokenType.CMD
+_T_DEFAULT = TokenType.DEFAULT
+_T_OPTION = TokenType.OPTION
+_T_ARGUMENT = TokenType.ARGUMENT
+_T_ARROW = TokenType.ARROW
+_T_STRING = TokenType.STRING
+_T_IDENTIFIER = TokenType.IDENTIFIER
+_T_FLAG = TokenType.FLAG
+_T_TYPE = TokenType.TYPE
+_T_ATTRIBUTE = TokenType.ATTRIBUTE
+_T_COMMA = TokenType.COMMA
+_T_NEWLINE = TokenType.NEWLINE
+_T_LPAREN = TokenType.LPAREN
+_T_RPAREN = TokenType.RPAREN
+_T_ROOT = TokenType.ROOT
+_T_DOLLAR = TokenType.DOLLAR
+_T_EOF = TokenType.EOF
+
+
 @dataclass
 class Token:
+    # 手动声明 __slots__（兼容3.7，dataclass 的 slots 参数需要3.10），每个token不再带 __dict__
+    __slots__ = ("type", "value", "line", "column")
+
     type: TokenType
     value: str
     line: int
     column: int
-    metadata: Optional[Dict[str, Any]] = None
 
     def __repr__(self):
         return f"Token({self.type.name}, '{self.value}', line:{self.line}, col:{self.column})"
@@ -43,6 +69,35 @@ class Token:
 
 # ==================== 词法分析器 ====================
 
+# 标识符的首字符和后续字符
+_IDENTIFIER_START = frozenset(string.ascii_letters + '_')
+_IDENTIFIER_CHARS = frozenset(string.ascii_letters + string.digits + '_-.')
+# 标志名中允许的字符
+_FLAG_CHARS = frozenset(string.ascii_letters + string.digits + '-')
+
+# 关键字文本到token类型的映射，扫描出完整标识符后再查表
+_KEYWORDS = {
+    'use': _T_USE,
+    'cmd': _T_CMD,
+    'default': _T_DEFAULT,
+    'option': _T_OPTION,
+    'root': _T_ROOT,
+    'appname': _T_APPNAME,
+}
+
+# 单字符标点
+_PUNCTUATION = {
+    ',': _T_COMMA,
+    '(': _T_LPAREN,
+    ')': _T_RPAREN,
+    '$': _T_DOLLAR,
+}
+
+# 方括号中的类型和属性
+_TYPE_NAMES = frozenset(("bool", "string", "int", "float"))
+_ATTRIBUTE_NAMES = frozenset(("required", "multiple"))
+
+
 class Lexer:
     def __init__(self, source: str):
         self.source = source
@@ -50,108 +105,156 @@ class Lexer:
         self.line = 1
         self.column = 1
         self.tokens: List[Token] = []
-
-        # 词法规则定义
-        self.rules = [
-            # 关键字
-            (TokenType.USE, r'use\b'),
-            (TokenType.CMD, r'cmd\b'),
-            (TokenType.DEFAULT, r'default\b'),
-            (TokenType.OPTION, r'option\b'),
-            (TokenType.ROOT, r'root\b'),
-            (TokenType.APPNAME, r'appname\b'),
-            (TokenType.ARROW, r'->'),
-
-            # 标点符号
-            (TokenType.COMMA, r','),
-            (TokenType.LPAREN, r'\('),
-            (TokenType.RPAREN, r'\)'),
-            (TokenType.DOLLAR, r'\$'),
-
-            # 标识符和特殊格式
-            (TokenType.FLAG, r'--?[a-zA-Z0-9\-]+'),
-            (TokenType.TYPE, r'\[(bool|string|int|float|choice:[^\]]+)\]'),
-            (TokenType.ATTRIBUTE, r'\[(required|default:[^\]]+|multiple|if\([^)]+\))\]'),
-            # 使用更复杂的正则表达式匹配带转义字符的字符串
-            (TokenType.STRING, r'"([^"\\]|\\.)*"'),
-            (TokenType.IDENTIFIER, r'<[^>]+>'),
-            (TokenType.IDENTIFIER, r'[a-zA-Z_][a-zA-Z0-9_\-\.]*'),
-
-            # 空白和注释（跳过）
-            (None, r'[ \t]+'),
-            (None, r'#.*'),
-
-            # 换行符
-            (TokenType.NEWLINE, r'\n'),
-        ]
+        # 每个换行符的位置，-1 作为第一行之前的虚拟换行符，用于按位置计算行列号
+        self._newline_offsets = [-1] + [match.start() for match in re.finditer('\n', source)]
 
     def tokenize(self) -> List[Token]:
-        """将源代码转换为token列表"""
-        while self.position < len(self.source):
-            self._read_next_token()
-
-        self.tokens.append(Token(TokenType.EOF, "", self.line, self.column))
-        return self.tokens
-
-    def _read_next_token(self):
-        """读取下一个token"""
-        remaining_text = self.source[self.position:]
-
-        for pattern_type, pattern in self.rules:
-            match = re.match(pattern, remaining_text)
-            if match:
-                value = match.group(0)
-                start_line, start_col = self.line, self.column
-
-                # 更新位置
-                self._update_position(value)
-
-                # 如果是跳过模式，不生成token
-                if pattern_type is None:
-                    return
-
-                # 处理特殊token类型
-                actual_token_type = pattern_type
-                processed_value = value
-
-                if pattern_type == TokenType.IDENTIFIER and value.startswith('<'):
-                    actual_token_type = TokenType.ARGUMENT
-                    processed_value = value[1:-1]
-                elif pattern_type == TokenType.TYPE:
-                    processed_value = value[1:-1]
-                elif pattern_type == TokenType.ATTRIBUTE:
-                    processed_value = value[1:-1]
-                elif pattern_type == TokenType.STRING:
-                    # 修复：处理字符串中的转义字符
-                    # 先去掉引号，然后解码转义序列
-                    processed_value = self._unescape_string(value[1:-1])
-
-                # 创建token
-                token = Token(actual_token_type, processed_value, start_line, start_col)
-                self.tokens.append(token)
-                return
-
-        raise SyntaxError(f"Unexpected character at line {self.line}, column {self.column}: "
-                          f"'{self.source[self.position]}'")
+        """将源代码转换为token列表
+
+        按当前字符分派到对应的扫描逻辑，有结束符的token用 str.find 查找结束位置。
+        """
+        source = self.source
+        length = len(source)
+        tokens = self.tokens
+        append = tokens.append
+        pos = self.position
+
+        # token按位置递增产生，当前行只需向前推进，不必每次二分查找
+        offsets = self._newline_offsets
+        last_line_index = len(offsets) - 1
+        line_index = 0
+
+        while pos < length:
+            char = source[pos]
+            start = pos
+            token_type = None
+            value = None
+
+            if char == ' ' or char == '\t':
+                # 空白（跳过）
+                pos += 1
+                while pos < length and (source[pos] == ' ' or source[pos] == '\t'):
+                    pos += 1
+                continue
+            elif char == '#':
+                # 注释（跳过），直到行尾
+                pos = source.find('\n', pos)
+                if pos == -1:
+                    pos = length
+                continue
+            elif char == '\n':
+                token_type = _T_NEWLINE
+                value = char
+                pos += 1
+            elif char in _IDENTIFIER_START:
+                pos += 1
+                while pos < length and source[pos] in _IDENTIFIER_CHARS:
+                    pos += 1
+                value = source[start:pos]
+                token_type = _KEYWORDS.get(value, _T_IDENTIFIER)
+            elif char == '-':
+                if source.startswith('->', pos):
+                    token_type = _T_ARROW
+                    pos += 2
+                else:
+                    pos += 1
+                    while pos < length and source[pos] in _FLAG_CHARS:
+                        pos += 1
+                    if pos - start > 1:
+                        token_type = _T_FLAG
+                value = source[start:pos]
+            elif char in _PUNCTUATION:
+                token_type = _PUNCTUATION[char]
+                value = char
+                pos += 1
+            elif char == '[':
+                token_type, pos, value = self._scan_bracket(start)
+            elif char == '"':
+                pos, has_escape = self._scan_string(start)
+                if pos != -1:
+                    token_type = _T_STRING
+                    # 去掉引号，只有包含转义符时才需要解码转义序列
+                    value = source[start + 1:pos - 1]
+                    if has_escape:
+                        value = self._unescape_string(value)
+            elif char == '<':
+                end = source.find('>', start + 1)
+                if end > start + 1:
+                    token_type = _T_ARGUMENT
+                    value = source[start + 1:end]
+                    pos = end + 1
+
+            if token_type is None:
+                self.position = start
+                line, column = self._locate(start)
+                raise SyntaxError(f"Unexpected character at line {line}, column {column}: "
+                                  f"'{char}'")
+
+            while line_index < last_line_index and offsets[line_index + 1] < start:
+                line_index += 1
+            append(Token(token_type, value, line_index + 1, start - offsets[line_index]))
+
+        self.position = pos
+        self.line, self.column = self._locate(pos)
+        tokens.append(Token(_T_EOF, "", self.line, self.column))
+        return tokens
+
+    def _scan_bracket(self, start: int) -> Tuple[Optional[TokenType], int, Optional[str]]:
+        """扫描 [...] 形式的类型或属性，返回token类型、结束位置和去掉括号后的内容"""
+        source = self.source
+
+        # if(...) 属性的括号内容可以包含 ]，需要单独处理
+        if source.startswith('[if(', start):
+            end = source.find(')', start + 4)
+            if end > start + 4 and source.startswith(']', end + 1):
+                return _T_ATTRIBUTE, end + 2, source[start + 1:end + 1]
+
+        end = source.find(']', start + 1)
+        if end == -1:
+            return None, start, None
+        content = source[start + 1:end]
+
+        # 判断类型时切出的内容直接作为token的值，不再重复切片
+        if content in _TYPE_NAMES or (content.startswith('choice:') and len(content) > 7):
+            return _T_TYPE, end + 1, content
+        if content in _ATTRIBUTE_NAMES or (content.startswith('default:') and len(content) > 8):
+            return _T_ATTRIBUTE, end + 1, content
+        return None, start, None
+
+    def _scan_string(self, start: int) -> Tuple[int, bool]:
+        """扫描字符串，返回结束引号之后的位置（未闭合时为-1）以及是否包含转义符"""
+        source = self.source
+        pos = start + 1
+        has_escape = False
+        while True:
+            quote = source.find('"', pos)
+            if quote == -1:
+                return -1, has_escape
+            backslash = source.find('\\', pos, quote)
+            if backslash == -1:
+                return quote + 1, has_escape
+            # 转义符不能转义换行符，也不能位于末尾
+            if backslash + 1 >= len(source) or source[backslash + 1] == '\n':
+                return -1, has_escape
+            has_escape = True
+            pos = backslash + 2
 
     def _unescape_string(self, s: str) -> str:
         """处理字符串中的转义序列"""
+        if '\\' not in s:
+            return s
         try:
-            # 使用 bytes 和 decode 处理转义序列
-            return bytes(s, "utf-8").decode("unicode_escape")
+            # 非latin-1字符先转成 \uXXXX，unicode_escape 解码时会还原，避免中文等字符被错误解码
+            return s.encode("latin-1", "backslashreplace").decode("unicode_escape")
         except UnicodeDecodeError:
             # 如果解码失败，返回原始字符串
             return s
 
-    def _update_position(self, text: str):
-        """更新行列位置"""
-        for char in text:
-            if char == '\n':
-                self.line += 1
-                self.column = 1
-            else:
-                self.column += 1
-            self.position += 1
+    def _locate(self, position: int) -> Tuple[int, int]:
+        """计算位置对应的行列号（从1开始）"""
+        # 位置之前最后一个换行符的下标
+        index = bisect.bisect_left(self._newline_offsets, position) - 1
+        return index + 1, position - self._newline_offsets[index]
 
 
 # ==================== 语法分析器 ====================
@@ -159,6 +262,11 @@ class Lexer:
 class Parser:
     def __init__(self, tokens: List[Token]):
         self.tokens = tokens
+        # 按字段拆分的token类型和值数组，末尾补一个EOF哨兵，
+        # 这样 self._types[self.position] 永远不会越界，判断时无需再检查长度
+        self._types = [token.type for token in tokens]
+        self._types.append(_T_EOF)
+        self._values = [token.value for token in tokens]
         self.position = 0
         self.ast = []
         self.has_default = False
@@ -168,23 +276,23 @@ class Parser:
     def parse(self) -> List[Dict]:
         """解析token流为AST"""
         while not self._is_eof():
-            if self._match(TokenType.NEWLINE):
+            if self._match(_T_NEWLINE):
                 self._advance()
                 continue
 
             # 解析各种语句类型
-            if self._match(TokenType.APPNAME):
+            if self._match(_T_APPNAME):
                 self.ast.append(self._parse_appname_statement())
-            elif self._match(TokenType.USE):
+            elif self._match(_T_USE):
                 self.ast.append(self._parse_use_statement())
-            elif self._match(TokenType.ROOT):  # 解析根选项
+            elif self._match(_T_ROOT):  # 解析根选项
                 self.root_options.append(self._parse_root_option())
-            elif self._match(TokenType.CMD):
+            elif self._match(_T_CMD):
                 if self.has_default:
                     raise SyntaxError("Cannot use 'cmd' after 'default' command")
                 self.has_commands = True
                 self.ast.append(self._parse_command())
-            elif self._match(TokenType.DEFAULT):
+            elif self._match(_T_DEFAULT):
                 if self.has_commands or self.has_default:
                     raise SyntaxError("Cannot use 'default' with other commands")
                 self.has_default = True
@@ -210,7 +318,7 @@ class Parser:
         option["line"] = root_token.line
 
         # 检查是否有动作定义
-        if self._match(TokenType.ARROW):
+        if self._match(_T_ARROW):
             action = self._parse_action()
             option["action"] = action
 
@@ -219,7 +327,7 @@ class Parser:
     def _parse_use_statement(self) -> Dict:
         """解析use语句"""
         use_token = self._advance()
-        module_token = self._expect(TokenType.STRING)
+        module_token = self._expect(_T_STRING)
 
         return {
             "type": "use",
@@ -230,7 +338,7 @@ class Parser:
     def _parse_appname_statement(self) -> Dict:
         """解析appname语句"""
         appname_token = self._advance()
-        name_token = self._expect(TokenType.STRING)
+        name_token = self._expect(_T_STRING)
 
         return {
             "type": "appname",
@@ -241,10 +349,10 @@ class Parser:
     def _parse_command(self) -> Dict:
         """解析命令定义"""
         cmd_token = self._advance()
-        name_token = self._expect(TokenType.IDENTIFIER)
+        name_token = self._expect(_T_IDENTIFIER)
 
         description = None
-        if self._match(TokenType.STRING):
+        if self._match(_T_STRING):
             description_token = self._advance()
             description = description_token.value
 
@@ -261,7 +369,7 @@ class Parser:
     def _parse_default_command(self) -> Dict:
         """解析default命令定义"""
         default_token = self._advance()
-        description_token = self._expect(TokenType.STRING)
+        description_token = self._expect(_T_STRING)
 
         body = self._parse_command_body()
 
@@ -274,24 +382,28 @@ class Parser:
 
     def _parse_command_body(self) -> Dict:
         """解析命令体"""
+        types = self._types
         options = []
         arguments = []
         action = None
 
-        while not self._is_eof() and not self._match(TokenType.CMD) and not self._match(
-                TokenType.DEFAULT) and not self._match(TokenType.USE):
-            if self._match(TokenType.NEWLINE):
-                self._advance()
-                continue
+        # 每轮只取一次当前token类型，直接做身份比较，不再逐个调用 _is_eof/_match
+        while True:
+            current_type = types[self.position]
+            if (current_type is _T_EOF or current_type is _T_CMD
+                    or current_type is _T_DEFAULT or current_type is _T_USE):
+                break
 
-            if self._match(TokenType.FLAG):
+            if current_type is _T_NEWLINE:
+                self.position += 1
+            elif current_type is _T_FLAG:
                 options.append(self._parse_option())
-            elif self._match(TokenType.ARGUMENT):
+            elif current_type is _T_ARGUMENT:
                 arguments.append(self._parse_argument())
-            elif self._match(TokenType.ARROW):
+            elif current_type is _T_ARROW:
                 action = self._parse_action()
             else:
-                self._advance()
+                self.position += 1
 
         return {
             "options": options,
@@ -301,43 +413,54 @@ class Parser:
 
     def _parse_option(self) -> Dict:
         """解析选项定义"""
+        # 直接在类型/值数组上推进位置，EOF哨兵保证不会越过末尾
+        types = self._types
+        values = self._values
+        position = self.position
         flags = []
 
-        while self._match(TokenType.FLAG):
-            flags.append(self._advance().value)
-            if self._match(TokenType.COMMA):
-                self._advance()
+        while types[position] is _T_FLAG:
+            flags.append(values[position])
+            position += 1
+            if types[position] is _T_COMMA:
+                position += 1
 
         option_param = None
-        if self._match(TokenType.ARGUMENT):
-            option_param_token = self._advance()
-            option_param = option_param_token.value
+        if types[position] is _T_ARGUMENT:
+            option_param = values[position]
+            position += 1
 
         option_type = None
         attributes = {}
         description = None
 
-        if self._match(TokenType.TYPE):
-            type_token = self._advance()
-            option_type = type_token.value
+        if types[position] is _T_TYPE:
+            option_type = values[position]
+            position += 1
 
-        while self._match(TokenType.ATTRIBUTE):
-            attr_token = self._advance()
-            attr_value = attr_token.value
+        while types[position] is _T_ATTRIBUTE:
+            attr_value = values[position]
+            position += 1
 
-            if ':' in attr_value:
+            # 常见的属性先走快速路径，其余属性按第一个 ':' 拆分为键和值
+            if attr_value in _ATTRIBUTE_NAMES:
+                attributes[attr_value] = True
+            elif attr_value.startswith('default:'):
+                attributes['default'] = attr_value[8:]
+            elif ':' in attr_value:
                 key, value = attr_value.split(':', 1)
                 attributes[key] = value
             else:
                 attributes[attr_value] = True
 
-        if self._match(TokenType.STRING):
-            desc_token = self._advance()
-            description = desc_token.value
+        if types[position] is _T_STRING:
+            description = values[position]
+            position += 1
 
-        if self._match(TokenType.NEWLINE):
-            self._advance()
+        if types[position] is _T_NEWLINE:
+            position += 1
 
+        self.position = position
         return {
             "type": "option",
             "flags": flags,
@@ -349,8 +472,12 @@ class Parser:
 
     def _parse_argument(self) -> Dict:
         """解析参数定义"""
-        name_token = self._advance()
-        name = name_token.value
+        types = self._types
+        values = self._values
+        position = self.position
+
+        name = values[position]
+        position += 1
 
         is_variadic = False
         if name.endswith('...'):
@@ -361,27 +488,33 @@ class Parser:
         attributes = {}
         description = None
 
-        if self._match(TokenType.TYPE):
-            type_token = self._advance()
-            arg_type = type_token.value
+        if types[position] is _T_TYPE:
+            arg_type = values[position]
+            position += 1
 
-        while self._match(TokenType.ATTRIBUTE):
-            attr_token = self._advance()
-            attr_value = attr_token.value
+        while types[position] is _T_ATTRIBUTE:
+            attr_value = values[position]
+            position += 1
 
-            if ':' in attr_value:
+            # 常见的属性先走快速路径，其余属性按第一个 ':' 拆分为键和值
+            if attr_value in _ATTRIBUTE_NAMES:
+                attributes[attr_value] = True
+            elif attr_value.startswith('default:'):
+                attributes['default'] = attr_value[8:]
+            elif ':' in attr_value:
                 key, value = attr_value.split(':', 1)
                 attributes[key] = value
             else:
                 attributes[attr_value] = True
 
-        if self._match(TokenType.STRING):
-            desc_token = self._advance()
-            description = desc_token.value
+        if types[position] is _T_STRING:
+            description = values[position]
+            position += 1
 
-        if self._match(TokenType.NEWLINE):
-            self._advance()
+        if types[position] is _T_NEWLINE:
+            position += 1
 
+        self.position = position
         return {
             "type": "argument",
             "name": name,
@@ -394,27 +527,27 @@ class Parser:
     def _parse_action(self) -> Dict:
         """解析动作定义"""
         arrow_token = self._advance()
-        function_token = self._expect(TokenType.IDENTIFIER)
+        function_token = self._expect(_T_IDENTIFIER)
 
         params = []
-        if self._match(TokenType.LPAREN):
+        if self._match(_T_LPAREN):
             self._advance()
 
-            while not self._match(TokenType.RPAREN) and not self._is_eof():
-                if self._match(TokenType.DOLLAR):
+            while not self._match(_T_RPAREN) and not self._is_eof():
+                if self._match(_T_DOLLAR):
                     self._advance()
-                    param_token = self._expect(TokenType.IDENTIFIER)
+                    param_token = self._expect(_T_IDENTIFIER)
                     params.append(f"${param_token.value}")
 
-                    if self._match(TokenType.COMMA):
+                    if self._match(_T_COMMA):
                         self._advance()
                 else:
                     break
 
-            if self._match(TokenType.RPAREN):
+            if self._match(_T_RPAREN):
                 self._advance()
 
-        if self._match(TokenType.NEWLINE):
+        if self._match(_T_NEWLINE):
             self._advance()
 
         return {
@@ -425,9 +558,8 @@ class Parser:
         }
 
     def _match(self, token_type: TokenType) -> bool:
-        if self._is_eof():
-            return False
-        return self.tokens[self.position].type == token_type
+        current_type = self._types[self.position]
+        return current_type is token_type and current_type is not _T_EOF
 
     def _expect(self, token_type: TokenType) -> Token:
         if self._match(token_type):
@@ -437,18 +569,37 @@ class Parser:
             f"Expected {token_type}, got {current_token.type} at line {current_token.line}, column {current_token.column}")
 
     def _advance(self) -> Token:
-        if not self._is_eof():
-            token = self.tokens[self.position]
-            self.position += 1
-            return token
+        position = self.position
+        if self._types[position] is not _T_EOF:
+            self.position = position + 1
+            return self.tokens[position]
         return self.tokens[-1]
 
     def _is_eof(self) -> bool:
-        return self.position >= len(self.tokens) or self.tokens[self.position].type == TokenType.EOF
+        return self._types[self.position] is _T_EOF
 
 
 # ==================== CLIScript解析器主类 ====================
 
+def _dumps_ast(ast: Any) -> str:
+    """把AST格式化为缩进2格的JSON，安装了 orjson 时使用它加速
+
+    orjson 只在打印时才导入，不增加每次运行CLI的启动时间；
+    它拒绝孤立代理字符等非法UTF-8字符串，此时退回标准库 json。
+    """
+    try:
+        import orjson
+    except ImportError:  # 可选依赖
+        orjson = None
+
+    if orjson is not None:
+        try:
+            return orjson.dumps(ast, option=orjson.OPT_INDENT_2).decode("utf-8")
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(ast, indent=2, ensure_ascii=False)
+
+
 class CLIScriptParser:
     def __init__(self):
         self.lexer = None
@@ -480,4 +631,4 @@ class CLIScriptParser:
             ast = self.parser.ast
 
         print("\n=== AST ===")
-        print(json.dumps(ast, indent=2, ensure_ascii=False))
+        print(_dumps_ast(ast))
@@ -1,12 +1,36 @@
 import sys
 import subprocess
 import os
+import json
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from io import StringIO
 from contextlib import redirect_stdout, redirect_stderr
 from typing import List, Dict, Any, Optional, Tuple
 import tempfile
 
 
+# 常驻测试工作进程的脚本，见 _test_worker.py
+_WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_test_worker.py")
+
+
+def _stop_workers(workers: List[subprocess.Popen]):
+    """关闭工作进程的输入管道并等待其退出，列表会被清空"""
+    while workers:
+        worker = workers.pop()
+        try:
+            worker.stdin.close()
+        except OSError:
+            pass
+        try:
+            worker.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            worker.kill()
+            worker.wait()
+        worker.stdout.close()
+
+
 class CLITestRunner:
     """CLI测试运行器 - 用于测试CLI命令的输出和错误"""
 
@@ -19,6 +43,20 @@ class CLITestRunner:
         """
         self.main_module_path = main_module_path
         self.temp_files = []
+        # 支持 fork 的平台上使用常驻工作进程，其余平台每条命令启动一个新进程；
+        # 每个线程使用自己的工作进程，多个线程可以并行运行命令
+        self._workers = []
+        self._local = threading.local()
+        # 保护 _workers 和 temp_files，它们会被多个线程同时修改
+        self._lock = threading.Lock()
+        # 测试运行器被回收或解释器退出时，确保工作进程也被关闭
+        self._finalizer = weakref.finalize(self, _stop_workers, self._workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.cleanup()
 
     def run_command(self, args: List[str], input_text: str = None,
                     capture_output: bool = True) -> Dict[str, Any]:
@@ -36,7 +74,16 @@ class CLITestRunner:
         cmd = [sys.executable, self.main_module_path] + args
 
         try:
-            if capture_output:
+            if capture_output and hasattr(os, "fork"):
+                exit_code, stdout, stderr = self._run_in_worker(cmd, args, input_text)
+                return {
+                    "success": exit_code == 0,
+                    "exit_code": exit_code,
+                    "stdout": stdout,
+                    "stderr": stderr,
+                    "command": " ".join(cmd)
+                }
+            elif capture_output:
                 result = subprocess.run(
                     cmd,
                     input=input_text,
@@ -79,6 +126,85 @@ class CLITestRunner:
                 "command": " ".join(cmd)
             }
 
+    def _run_in_worker(self, cmd: List[str], args: List[str],
+                       input_text: Optional[str]) -> Tuple[int, str, str]:
+        """在常驻工作进程中运行命令，返回退出码、标准输出和标准错误"""
+        paths = []
+        try:
+            for content in (input_text or "", "", ""):
+                fd, path = tempfile.mkstemp(suffix=".cliscript-io")
+                with os.fdopen(fd, 'w') as f:
+                    f.write(content)
+                paths.append(path)
+
+            request = json.dumps({
+                "args": args,
+                "stdin": paths[0],
+                "stdout": paths[1],
+                "stderr": paths[2],
+                "timeout": 30
+            })
+
+            # 环境变量（如PYTHONPATH）和工作目录只在解释器启动时生效，
+            # 与启动工作进程时不同就重新启动一个，保证与单独运行的结果一致
+            startup = (os.getcwd(), dict(os.environ))
+            worker = getattr(self._local, "worker", None)
+            if worker is not None and (worker.poll() is not None or self._local.startup != startup):
+                with self._lock:
+                    if worker in self._workers:
+                        self._workers.remove(worker)
+                _stop_workers([worker])
+                worker = None
+            if worker is None:
+                worker = subprocess.Popen(
+                    [sys.executable, _WORKER_SCRIPT, self.main_module_path],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    text=True,
+                    cwd=startup[0],
+                    env=startup[1]
+                )
+                self._local.worker = worker
+                self._local.startup = startup
+                with self._lock:
+                    self._workers.append(worker)
+
+            try:
+                worker.stdin.write(request + "\n")
+                worker.stdin.flush()
+                reply = worker.stdout.readline()
+            except OSError:
+                reply = ""
+            if not reply:
+                with self._lock:
+                    if worker in self._workers:
+                        self._workers.remove(worker)
+                _stop_workers([worker])
+                raise RuntimeError("test worker exited unexpectedly")
+
+            exit_code = json.loads(reply)["exit_code"]
+            if exit_code is None:
+                raise subprocess.TimeoutExpired(cmd, 30)
+
+            with open(paths[1]) as f:
+                stdout = f.read()
+            with open(paths[2]) as f:
+                stderr = f.read()
+            return exit_code, stdout, stderr
+        finally:
+            for path in paths:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+    def close(self):
+        """关闭所有常驻工作进程"""
+        with self._lock:
+            workers = list(self._workers)
+            del self._workers[:]
+        _stop_workers(workers)
+
     def assert_success(self, args: List[str], input_text: str = None,
                        message: str = None) -> Dict[str, Any]:
         """
@@ -193,17 +319,20 @@ class CLITestRunner:
         fd, path = tempfile.mkstemp(suffix=suffix)
         with os.fdopen(fd, 'w') as f:
             f.write(content)
-        self.temp_files.append(path)
+        with self._lock:
+            self.temp_files.append(path)
         return path
 
     def cleanup(self):
-        """清理临时文件"""
-        for path in self.temp_files:
+        """清理临时文件，并关闭常驻工作进程"""
+        self.close()
+        with self._lock:
+            temp_files, self.temp_files = self.temp_files, []
+        for path in temp_files:
             try:
                 os.unlink(path)
             except:
                 pass  # 忽略删除错误
-        self.temp_files = []
 
 
 class InMemoryCLITester:
@@ -299,73 +428,43 @@ def run_comprehensive_tests(test_runner: CLITestRunner):
     print("=== 开始全面CLI测试 ===")
 
     try:
-        # 测试1: 根选项 -v
-        print("测试1: 根选项 -v")
-        result = test_runner.assert_success(["-v"])
-        print("✓ 根选项 -v 测试通过")
-
-        # 测试2: 根选项 --version
-        print("测试2: 根选项 --version")
-        result = test_runner.assert_success(["--version"])
-        print("✓ 根选项 --version 测试通过")
-
-        # 测试3: 根选项 -u 使用默认值
-        print("测试3: 根选项 -u 使用默认值")
-        result = test_runner.assert_success(["-u"])
-        print("✓ 根选项 -u 使用默认值测试通过")
-
-        # 测试4: 根选项 --update 使用指定值
-        print("测试4: 根选项 --update 使用指定值")
-        result = test_runner.assert_success(["--update", "2.0.0"])
-        print("✓ 根选项 --update 使用指定值测试通过")
-
-        # 测试5: 命令 file-copy
-        print("测试5: 命令 file-copy")
-        # 创建临时文件用于测试
+        # 创建临时文件用于测试5
         source_file = test_runner.create_temp_file("test content")
         target_file = test_runner.create_temp_file(suffix="_target.txt")
 
-        result = test_runner.assert_success([
-            "file-copy",
-            "-r", "-f",
-            source_file,
-            target_file
-        ])
-        print("✓ 命令 file-copy 测试通过")
-
-        # 测试6: 命令 search
-        print("测试6: 命令 search")
-        result = test_runner.assert_success([
-            "search",
-            "-p", "*.txt",
-            "-c",
-            "/tmp"
-        ])
-        print("✓ 命令 search 测试通过")
-
-        # 测试7: 命令 info
-        print("测试7: 命令 info")
-        result = test_runner.assert_success(["info"])
-        print("✓ 命令 info 测试通过")
-
-        # 测试8: 命令 sudo
-        print("测试8: 命令 sudo")
-        result = test_runner.assert_success([
-            "sudo",
-            "-u", "admin",
-            "ls", "-la"
-        ])
-        print("✓ 命令 sudo 测试通过")
-
-        # 测试9: 帮助信息
-        print("测试9: 帮助信息")
-        result = test_runner.assert_success(["--help"])
-        print("✓ 帮助信息测试通过")
-
-        # 测试10: 子命令帮助
-        print("测试10: 子命令帮助")
-        result = test_runner.assert_success(["file-copy", "--help"])
-        print("✓ 子命令帮助测试通过")
+        # (标题, 命令行参数, 通过时的提示)
+        steps = [
+            ("测试1: 根选项 -v", ["-v"], "✓ 根选项 -v 测试通过"),
+            ("测试2: 根选项 --version", ["--version"], "✓ 根选项 --version 测试通过"),
+            ("测试3: 根选项 -u 使用默认值", ["-u"], "✓ 根选项 -u 使用默认值测试通过"),
+            ("测试4: 根选项 --update 使用指定值", ["--update", "2.0.0"],
+             "✓ 根选项 --update 使用指定值测试通过"),
+            ("测试5: 命令 file-copy", ["file-copy", "-r", "-f", source_file, target_file],
+             "✓ 命令 file-copy 测试通过"),
+            ("测试6: 命令 search", ["search", "-p", "*.txt", "-c", "/tmp"], "✓ 命令 search 测试通过"),
+            ("测试7: 命令 info", ["info"], "✓ 命令 info 测试通过"),
+            ("测试8: 命令 sudo", ["sudo", "-u", "admin", "ls", "-la"], "✓ 命令 sudo 测试通过"),
+            ("测试9: 帮助信息", ["--help"], "✓ 帮助信息测试通过"),
+            ("测试10: 子命令帮助", ["file-copy", "--help"], "✓ 子命令帮助测试通过"),
+        ]
+
+        def run_step(step):
+            try:
+                test_runner.assert_success(step[1])
+            except AssertionError as e:
+                return e
+            return None
+
+        # 各测试互不依赖，并行运行后再按顺序输出结果
+        max_workers = min(len(steps), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            errors = list(executor.map(run_step, steps))
+
+        for (title, _, passed), error in zip(steps, errors):
+            print(title)
+            if error is not None:
+                raise error
+            print(passed)
 
         print("=== 所有测试通过! ===")
 
@@ -376,7 +475,7 @@ def run_comprehensive_tests(test_runner: CLITestRunner):
         print(f"❌ 测试出错: {e}")
         return False
     finally:
-        # 清理临时文件
+        # 清理临时文件，同时关闭线程池各线程启动的工作进程
         test_runner.cleanup()
 
     return True
@@ -419,6 +518,9 @@ def run_regression_tests(test_runner: CLITestRunner):
     except Exception as e:
         print(f"❌ 回归测试出错: {e}")
         return False
+    finally:
+        # 关闭本轮测试启动的工作进程
+        test_runner.close()
 
     return True
 